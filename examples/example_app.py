@@ -123,7 +123,7 @@ def create_app():
         sa.create_all()
         initialize_data()
 
-        graphene_rest = GraphQLREST(schema)
+        graphene_rest = GraphQLREST(schema, stream=True)
         graphene_rest.init_app(app)
 
     return app
@@ -156,4 +156,5 @@ def initialize_data():
 if __name__ == '__main__':
     app = create_app()
 
-    app.run(port=8005, debug=True)
+    # every open stream occupies a thread while it is open
+    app.run(port=8005, debug=True, threaded=True)
@@ -1,4 +1,5 @@
-from typing import Optional, Union
+import time
+from typing import Dict, Iterable, Optional, Set, Union
 
 import flask
 import graphene
@@ -8,16 +9,47 @@ from graphene.relay import Node
 from graphene.test import default_format_error, format_execution_result
 from graphene.types.definitions import GrapheneInterfaceType
 from graphql import GraphQLEnumType, GraphQLObjectType, GraphQLScalarType, GraphQLNonNull, GraphQLList, GraphQLField
+from graphql import GraphQLInterfaceType
 from graphql.type.definition import GraphQLType
 from graphql_server import encode_execution_results, json_encode
 
+from .pubsub import FilePubSub, InProcessPubSub, PubSub, Subscription
+
 
 class GraphQLREST(object):
     schema: graphene.Schema
     app: flask.Flask = None
+    stream: bool = False
+    pubsub: PubSub = None
+
+    def __init__(self,
+                 schema: graphene.Schema,
+                 app: flask.Flask = None,
+                 stream: bool = False,
+                 pubsub: PubSub = None,
+                 touches: Dict[str, Iterable[str]] = None,
+                 heartbeat_interval: float = 15.0):
+        """
+        :param stream: also expose a Server-Sent Events endpoint at ``/<field>/stream`` for every query field,
+            which pushes a re-executed result whenever a mutation endpoint touches one of the types it selects.
+        :param pubsub: backend the mutation endpoints publish their touched types to, e.g. a worker handling
+            only mutations can publish without exposing streams. Defaults to :class:`InProcessPubSub`
+            when ``stream`` is enabled.
+        :param touches: names of the types touched by each mutation field, overriding :meth:`get_touched_types`.
+        :param heartbeat_interval: seconds between keep-alive comments sent on idle streams.
+        """
+        if heartbeat_interval <= 0:
+            raise ValueError('heartbeat_interval must be positive')
 
-    def __init__(self, schema: graphene.Schema, app: flask.Flask = None):
         self.schema = schema
+        self.stream = stream
+        self.touches = touches or {}
+        self.heartbeat_interval = heartbeat_interval
+
+        if pubsub is not None:
+            self.pubsub = pubsub
+        elif stream:
+            self.pubsub = InProcessPubSub()
 
         if app is not None:
             self.init_app(app)
@@ -40,6 +72,12 @@ class GraphQLREST(object):
                                  endpoint=endpoint,
                                  methods=[http_method, ])
 
+                if operation_name == 'query' and self.stream:
+                    app.add_url_rule(f'/{field_name}/stream',
+                                     view_func=self._get_stream_view_func(operation_name, field, field_name),
+                                     endpoint=f'{endpoint}.stream',
+                                     methods=['GET', ])
+
     def format_result(self, result):
         return format_execution_result(result, default_format_error)
 
@@ -97,7 +135,71 @@ class GraphQLREST(object):
 
         raise NotImplementedError
 
-    def _get_view_func(self, operation: str, field: GraphQLField, field_name: str):
+    def get_selection_types(self,
+                            parent_type: Union[GraphQLObjectType, GrapheneInterfaceType],
+                            selection_set: Optional[graphql_ast.SelectionSet]) -> Set[str]:
+        """Returns the names of all object and interface types selected by `selection_set`."""
+        if selection_set is None:
+            return set()
+
+        type_names = {parent_type.name}
+
+        for selection in selection_set.selections:
+            if isinstance(selection, graphql_ast.InlineFragment):
+                fragment_type = self.schema.get_type(selection.type_condition.name.value)
+                type_names |= self.get_selection_types(fragment_type, selection.selection_set)
+            else:
+                sub_field = parent_type.fields[selection.name.value]
+                type_names |= self.get_selection_types(self.get_return_type(sub_field.type),
+                                                       selection.selection_set)
+
+        return type_names
+
+    def get_touched_types(self, field_name: str, field: GraphQLField) -> Set[str]:
+        """Returns the names of the types a mutation touches, by default the types of its payload fields."""
+        if field_name in self.touches:
+            return self.get_possible_type_names(self.touches[field_name])
+
+        payload_type = self.get_return_type(field.type)
+
+        if not isinstance(payload_type, (GraphQLObjectType, GrapheneInterfaceType)):
+            return set()
+
+        type_names = set()
+
+        for sub_field in payload_type.fields.values():
+            sub_field_type = self.get_return_type(sub_field.type)
+
+            if isinstance(sub_field_type, (GraphQLObjectType, GrapheneInterfaceType)):
+                type_names.add(sub_field_type.name)
+
+        return self.get_possible_type_names(type_names)
+
+    def get_possible_type_names(self, type_names: Iterable[str]) -> Set[str]:
+        """Adds the names of the types implementing any of the interfaces in `type_names`."""
+        type_map = self.schema.get_type_map()
+        possible_type_names = set(type_names)
+
+        for type_name in possible_type_names.copy():
+            graphql_type = type_map.get(type_name)
+
+            if isinstance(graphql_type, GraphQLInterfaceType):
+                possible_type_names.update(possible_type.name
+                                           for possible_type in self.schema.get_possible_types(graphql_type))
+
+        return possible_type_names
+
+    @staticmethod
+    def format_event(result: str, event: str = None) -> str:
+        lines = [f'event: {event}\n'] if event is not None else []
+        lines.extend(f'data: {line}\n' for line in result.splitlines())
+        return ''.join(lines) + '\n'
+
+    def _get_operation(self, operation: str, field: GraphQLField, field_name: str):
+        """
+        Returns a function building the document for the request variables,
+        and a function executing that document and encoding its result.
+        """
         schema = self.schema
         variable_definitions = []
         arguments = []
@@ -111,9 +213,7 @@ class GraphQLREST(object):
                 type=variable_type,
             ))
 
-        def view_func():
-            variable_values = self.get_variable_values()
-
+        def get_document(variable_values):
             field_selection_set = self._get_field_selection_set(field, include_node=True)
 
             if hasattr(field.type, 'graphene_type') and issubclass(field.type.graphene_type, Node):
@@ -143,16 +243,37 @@ class GraphQLREST(object):
                 ]
             )
 
+            return document_ast
+
+        def execute(document_ast, variable_values):
             execution_results = schema.execute(
                 document_ast,
                 variable_values=variable_values
             )
 
+            if operation == 'mutation' and self.pubsub is not None \
+                    and not execution_results.errors and execution_results.data:
+                # the mutation is already done, a failing backend must not turn it into an error response
+                try:
+                    self.pubsub.publish(self.get_touched_types(field_name, field))
+                except Exception:
+                    flask.current_app.logger.exception(f'Failed to publish the types touched by {field_name}')
+
             # TODO custom encoder that positions data[field_name] at data
-            result, status_code = encode_execution_results([execution_results],
-                                                           is_batch=False,
-                                                           format_error=default_format_error,
-                                                           encode=json_encode)
+            return encode_execution_results([execution_results],
+                                            is_batch=False,
+                                            format_error=default_format_error,
+                                            encode=json_encode)
+
+        return get_document, execute
+
+    def _get_view_func(self, operation: str, field: GraphQLField, field_name: str):
+        get_document, execute = self._get_operation(operation, field, field_name)
+
+        def view_func():
+            variable_values = self.get_variable_values()
+            document_ast = get_document(variable_values)
+            result, status_code = execute(document_ast, variable_values)
 
             return Response(result,
                             status=status_code,
@@ -160,6 +281,64 @@ class GraphQLREST(object):
 
         return view_func
 
+    def _get_stream_view_func(self, operation: str, field: GraphQLField, field_name: str):
+        get_document, execute = self._get_operation(operation, field, field_name)
+
+        def stream_view_func():
+            # the contexts are not kept around while the stream idles, so the teardown handlers
+            # (e.g. releasing database sessions) run after every execution
+            app = flask.current_app._get_current_object()
+            environ = request.environ
+            variable_values = self.get_variable_values()
+            document_ast = get_document(variable_values)
+            field_selection_set = document_ast.definitions[0].selection_set.selections[0].selection_set
+            dependent_types = self.get_possible_type_names(
+                self.get_selection_types(self.get_return_type(field.type), field_selection_set))
+
+            # subscribe before the first execution so that no mutation in between is missed
+            subscription = self.pubsub.subscribe()
+            result, status_code = execute(document_ast, variable_values)
+
+            if status_code != 200:
+                subscription.close()
+                return Response(result,
+                                status=status_code,
+                                content_type='application/json')
+
+            def generate(last_result):
+                yield self.format_event(last_result)
+                last_write = time.monotonic()
+
+                while True:
+                    timeout = max(last_write + self.heartbeat_interval - time.monotonic(), 0)
+                    type_names = subscription.get(timeout=timeout)
+
+                    if type_names is not None and not dependent_types.isdisjoint(type_names):
+                        try:
+                            with app.request_context(environ):
+                                result, status_code = execute(document_ast, variable_values)
+                        except Exception:
+                            # keep the stream open, the next matching mutation retries the execution
+                            app.logger.exception(f'Failed to re-execute the {field_name} stream')
+                        else:
+                            if result != last_result:
+                                last_result = result
+                                yield self.format_event(result, event='error' if status_code != 200 else None)
+                                last_write = time.monotonic()
+
+                    # unrelated publications must not postpone the keep-alive
+                    if time.monotonic() - last_write >= self.heartbeat_interval:
+                        yield ': keep-alive\n\n'
+                        last_write = time.monotonic()
+
+            response = Response(generate(result),
+                                content_type='text/event-stream',
+                                headers={'Cache-Control': 'no-cache'})
+            response.call_on_close(subscription.close)
+            return response
+
+        return stream_view_func
+
     def get_variable_values(self):
         if request.method == 'GET':
             return request.args
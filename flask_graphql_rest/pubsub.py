@@ -0,0 +1,123 @@
+import json
+import os
+import queue
+import threading
+import time
+from typing import FrozenSet, Iterable, Optional
+
+
+class Subscription(object):
+    """Receives the sets of type names published after it was created."""
+
+    def get(self, timeout: float = None) -> Optional[FrozenSet[str]]:
+        """Block until a publication arrives and return its type names, or ``None`` on timeout."""
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class PubSub(object):
+    """Backend interface used to tell stream endpoints which types a mutation touched.
+
+    Subclass it to plug in a message broker shared by several processes.
+    """
+
+    def publish(self, type_names: Iterable[str]):
+        raise NotImplementedError
+
+    def subscribe(self) -> Subscription:
+        raise NotImplementedError
+
+
+class InProcessSubscription(Subscription):
+    def __init__(self, pubsub: 'InProcessPubSub'):
+        self.pubsub = pubsub
+        self.queue = queue.Queue()
+
+    def get(self, timeout: float = None) -> Optional[FrozenSet[str]]:
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        self.pubsub._unsubscribe(self)
+
+
+class InProcessPubSub(PubSub):
+    """Default backend, only delivers publications made within the same process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscriptions = set()
+
+    def publish(self, type_names: Iterable[str]):
+        type_names = frozenset(type_names)
+
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+
+        for subscription in subscriptions:
+            subscription.queue.put(type_names)
+
+    def subscribe(self) -> InProcessSubscription:
+        subscription = InProcessSubscription(self)
+
+        with self._lock:
+            self._subscriptions.add(subscription)
+
+        return subscription
+
+    def _unsubscribe(self, subscription: InProcessSubscription):
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+
+class FileSubscription(Subscription):
+    def __init__(self, pubsub: 'FilePubSub'):
+        self.pubsub = pubsub
+        self.file = open(pubsub.path, 'r')
+        self.file.seek(0, os.SEEK_END)
+        self.buffer = ''
+
+    def get(self, timeout: float = None) -> Optional[FrozenSet[str]]:
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        while True:
+            self.buffer += self.file.read()
+
+            if '\n' in self.buffer:
+                line, self.buffer = self.buffer.split('\n', 1)
+                return frozenset(json.loads(line))
+
+            if deadline is not None and time.monotonic() >= deadline:
+                return None
+
+            time.sleep(self.pubsub.poll_interval)
+
+    def close(self):
+        self.file.close()
+
+
+class FilePubSub(PubSub):
+    """Local stand-in for a message broker when running several worker processes on one host.
+
+    Publications are appended as JSON lines to a shared file that subscribers tail.
+    The file is never truncated, so use it for development and testing only.
+    """
+
+    def __init__(self, path: str, poll_interval: float = 0.1):
+        self.path = path
+        self.poll_interval = poll_interval
+        open(self.path, 'a').close()
+
+    def publish(self, type_names: Iterable[str]):
+        line = json.dumps(sorted(type_names)) + '\n'
+
+        # a single small append is atomic on POSIX, so concurrent publishers do not interleave
+        with open(self.path, 'a') as f:
+            f.write(line)
+
+    def subscribe(self) -> FileSubscription:
+        return FileSubscription(self)
@@ -1,13 +1,18 @@
+import threading
+import time
+
 import graphene
 import pytest
-from flask import Flask
+from flask import Flask, json
 from flask_sqlalchemy import SQLAlchemy
 from graphene import relay
 from graphene_sqlalchemy import SQLAlchemyObjectType, SQLAlchemyConnectionField
-from sqlalchemy import func
+from graphql import GraphQLError
+from graphql.execution import ExecutionResult
+from sqlalchemy import event, func
 from sqlalchemy.orm import backref
 
-from flask_graphql_rest import GraphQLREST
+from flask_graphql_rest import GraphQLREST, InProcessPubSub
 from .utils import JSONResponseMixin, ApiClient
 
 
@@ -89,8 +94,14 @@ def models(sa):
     return _models
 
 
+@pytest.fixture
+def rest_options():
+    """Keyword arguments for :class:`GraphQLREST`, parametrize a test with it to override them."""
+    return {}
+
+
 @pytest.yield_fixture
-def schema(models, app):
+def schema(models, app, rest_options):
     class Publisher(SQLAlchemyObjectType):
         class Meta:
             model = models.Publisher
@@ -106,15 +117,27 @@ def schema(models, app):
             model = models.Book
             interfaces = (relay.Node,)
 
+    people = []
+
+    class Named(graphene.Interface):
+        name = graphene.String()
+
     class Query(graphene.ObjectType):
         node = relay.Node.Field()
         books = SQLAlchemyConnectionField(Book)
         hello = graphene.String(name=graphene.String(default_value="stranger"))
+        last_named = graphene.Field(Named)
 
         def resolve_hello(self, info, name):
             return 'Hello ' + name
 
+        def resolve_last_named(self, info):
+            return people[-1] if people else None
+
     class Person(graphene.ObjectType):
+        class Meta:
+            interfaces = (Named,)
+
         name = graphene.String()
         age = graphene.Int()
 
@@ -128,17 +151,31 @@ def schema(models, app):
 
         def mutate(self, info, name, age):
             person = Person(name=name, age=age)
+            people.append(person)
             ok = True
             return CreatePerson(person=person, ok=ok)
 
+    class CreateBook(graphene.Mutation):
+        class Arguments:
+            title = graphene.String()
+
+        book = graphene.Field(lambda: Book)
+
+        def mutate(self, info, title):
+            book = models.Book(title=title)
+            models.sa.session.add(book)
+            models.sa.session.commit()
+            return CreateBook(book=book)
+
     class MyMutations(graphene.ObjectType):
         create_person = CreatePerson.Field()
+        create_book = CreateBook.Field()
 
     _schema = graphene.Schema(
         query=Query,
         mutation=MyMutations
     )
-    graphene_rest = GraphQLREST(_schema)
+    graphene_rest = GraphQLREST(_schema, **rest_options)
     graphene_rest.init_app(app)
 
     return _schema
@@ -280,3 +317,220 @@ def test_query_connection(client, models, sa):
     assert response.json['data']['books']['pageInfo']['hasNextPage'] is False
     assert response.json['data']['books']['pageInfo']['hasPreviousPage'] is True
     assert response.json['data']['books']['edges'][0]['node']['title'] == book_2.title
+
+
+def parse_event(chunk):
+    assert chunk.startswith(b'data: ')
+    return json.loads(chunk[len(b'data: '):])
+
+
+def test_query_stream_disabled(client):
+    response = client.get('/books/stream')
+    assert response.status_code == 404
+
+
+@pytest.mark.parametrize('rest_options', [{'stream': True}])
+def test_query_stream(client):
+    stream = client.get('/books/stream')
+    assert stream.status_code == 200
+    assert stream.mimetype == 'text/event-stream'
+
+    events = iter(stream.response)
+    assert parse_event(next(events))['data']['books']['edges'] == []
+
+    response = client.post('/createBook', data={'title': 'Python Microservices Development'})
+    assert response.status_code == 200
+
+    edges = parse_event(next(events))['data']['books']['edges']
+    assert len(edges) == 1
+    assert edges[0]['node']['title'] == 'Python Microservices Development'
+
+    stream.close()
+
+
+@pytest.mark.parametrize('rest_options', [{
+    'stream': True,
+    'heartbeat_interval': 0.05,
+    'touches': {'createBook': ['Person'], 'createPerson': ['Book']}
+}])
+def test_query_stream_touches(client):
+    stream = client.get('/books/stream')
+    events = iter(stream.response)
+    assert parse_event(next(events))['data']['books']['edges'] == []
+
+    # changes the result, but touches none of the selected types
+    response = client.post('/createBook', data={'title': 'Python Microservices Development'})
+    assert response.status_code == 200
+    assert next(events) == b': keep-alive\n\n'
+
+    response = client.post('/createPerson', data={'name': 'foo', 'age': 20})
+    assert response.status_code == 200
+    assert len(parse_event(next(events))['data']['books']['edges']) == 1
+
+    stream.close()
+
+
+@pytest.mark.parametrize('rest_options', [{'stream': True, 'pubsub': InProcessPubSub(), 'heartbeat_interval': 0.05}])
+def test_query_stream_keep_alive(client, rest_options):
+    stream = client.get('/books/stream')
+    events = iter(stream.response)
+    next(events)
+
+    stop = threading.Event()
+
+    def publish_unrelated():
+        while not stop.wait(0.01):
+            rest_options['pubsub'].publish(['Person'])
+
+    publisher = threading.Thread(target=publish_unrelated)
+    publisher.start()
+
+    try:
+        # unrelated publications must not postpone the keep-alive
+        started_at = time.monotonic()
+        assert next(events) == b': keep-alive\n\n'
+        assert time.monotonic() - started_at < 0.5
+    finally:
+        stop.set()
+        publisher.join()
+
+    stream.close()
+
+
+@pytest.mark.parametrize('rest_options', [{'stream': True, 'pubsub': InProcessPubSub()}])
+def test_query_stream_error(client, rest_options):
+    response = client.get('/books/stream?first=abc')
+    assert response.status_code == 400
+    assert response.mimetype == 'application/json'
+    assert 'errors' in response.json
+    assert not rest_options['pubsub']._subscriptions
+
+
+@pytest.mark.parametrize('rest_options', [{'stream': True}])
+def test_query_interface_stream(client):
+    stream = client.get('/lastNamed/stream')
+    events = iter(stream.response)
+    assert parse_event(next(events))['data']['lastNamed'] is None
+
+    # the interface selected by the stream matches the concrete type touched by the mutation
+    response = client.post('/createPerson', data={'name': 'foo', 'age': 20})
+    assert response.status_code == 200
+    assert parse_event(next(events))['data']['lastNamed'] == {'name': 'foo'}
+
+    stream.close()
+
+
+@pytest.mark.parametrize('rest_options', [{'stream': True, 'touches': {'createBook': ['Node']}}])
+def test_query_stream_touches_interface(client):
+    stream = client.get('/books/stream')
+    events = iter(stream.response)
+    next(events)
+
+    # the interface touched by the mutation matches the concrete types selected by the stream
+    response = client.post('/createBook', data={'title': 'Python Microservices Development'})
+    assert response.status_code == 200
+    assert len(parse_event(next(events))['data']['books']['edges']) == 1
+
+    stream.close()
+
+
+@pytest.mark.parametrize('rest_options', [{'stream': True, 'pubsub': InProcessPubSub(), 'heartbeat_interval': 0.05}])
+def test_query_stream_execution_failure(client, schema, rest_options, monkeypatch):
+    stream = client.get('/books/stream')
+    events = iter(stream.response)
+    next(events)
+
+    def execute(*args, **kwargs):
+        raise RuntimeError
+
+    monkeypatch.setattr(schema, 'execute', execute)
+    rest_options['pubsub'].publish(['Book'])
+
+    # the failure is logged and the stream stays open
+    assert next(events) == b': keep-alive\n\n'
+
+    def execute(*args, **kwargs):
+        return ExecutionResult(errors=[GraphQLError('Invalid')], invalid=True)
+
+    monkeypatch.setattr(schema, 'execute', execute)
+    rest_options['pubsub'].publish(['Book'])
+
+    chunk = next(events)
+    assert chunk.startswith(b'event: error\ndata: ')
+    assert 'errors' in json.loads(chunk[len(b'event: error\ndata: '):])
+
+    stream.close()
+
+
+def test_heartbeat_interval(schema):
+    with pytest.raises(ValueError):
+        GraphQLREST(schema, stream=True, heartbeat_interval=0)
+
+
+@pytest.mark.parametrize('rest_options', [{'stream': True}])
+def test_query_stream_releases_connections(app, schema, sa):
+    checked_out = []
+    event.listen(sa.engine, 'checkout', lambda *args: checked_out.append(True))
+    event.listen(sa.engine, 'checkin', lambda *args: checked_out.pop())
+
+    # not preserving the request contexts, like a real server
+    client = app.test_client()
+
+    stream = client.get('/books/stream')
+    events = iter(stream.response)
+    next(events)
+    assert not checked_out
+
+    client.post('/createBook', data={'title': 'Python Microservices Development'})
+    assert len(parse_event(next(events))['data']['books']['edges']) == 1
+    assert not checked_out
+
+    stream.close()
+
+
+@pytest.mark.parametrize('rest_options', [{'pubsub': InProcessPubSub()}])
+def test_mutation_publish(client, rest_options):
+    # publishing alone does not expose the stream endpoints
+    assert client.get('/books/stream').status_code == 404
+
+    subscription = rest_options['pubsub'].subscribe()
+
+    response = client.post('/createBook', data={'title': 'Python Microservices Development'})
+    assert response.status_code == 200
+    assert subscription.get(timeout=0) == {'Book'}
+
+    # failed mutations do not publish
+    response = client.post('/createPerson', data={'name': 'foo'})
+    assert 'errors' in response.json
+    assert subscription.get(timeout=0) is None
+
+    subscription.close()
+
+
+class FailingPubSub(InProcessPubSub):
+    def publish(self, type_names):
+        raise IOError
+
+
+@pytest.mark.parametrize('rest_options', [{'pubsub': FailingPubSub()}])
+def test_mutation_publish_failure(client):
+    response = client.post('/createBook', data={'title': 'Python Microservices Development'})
+    assert response.status_code == 200
+    assert response.json['data']['createBook']['book']['title'] == 'Python Microservices Development'
+
+
+@pytest.mark.parametrize('rest_options', [{'stream': True}])
+def test_query_node_stream(client, models, sa):
+    publisher = models.Publisher(name='Packt')
+    sa.session.add(publisher)
+    sa.session.commit()
+
+    publisher_node_id = relay.Node.to_global_id('Publisher', publisher.id)
+
+    stream = client.get(f'/node/stream?id={publisher_node_id}')
+    assert stream.status_code == 200
+
+    events = iter(stream.response)
+    assert parse_event(next(events))['data']['node']['name'] == 'Packt'
+
+    stream.close()
@@ -0,0 +1,32 @@
+from flask_graphql_rest import FilePubSub, InProcessPubSub
+
+
+def test_in_process_pubsub():
+    pubsub = InProcessPubSub()
+    subscription = pubsub.subscribe()
+
+    pubsub.publish(['Book', 'Author'])
+    assert subscription.get(timeout=0) == {'Book', 'Author'}
+    assert subscription.get(timeout=0) is None
+
+    subscription.close()
+    pubsub.publish(['Book'])
+    assert subscription.get(timeout=0) is None
+
+
+def test_file_pubsub(tmpdir):
+    path = str(tmpdir.join('pubsub'))
+    publisher = FilePubSub(path)
+
+    # publications made before subscribing are not delivered
+    publisher.publish(['Publisher'])
+
+    subscription = FilePubSub(path, poll_interval=0.01).subscribe()
+    publisher.publish(['Book'])
+    publisher.publish(['Author'])
+
+    assert subscription.get(timeout=1) == {'Book'}
+    assert subscription.get(timeout=1) == {'Author'}
+    assert subscription.get(timeout=0) is None
+
+    subscription.close()